@@ -9,36 +9,69 @@
 """A simple compile script for users to compile lintrans themselves, also used by the GitHub action."""
 
 import argparse
+import glob
+import hashlib
 import os
 import re
 import shlex
 import shutil
+import stat
+import subprocess
 import sys
-from importlib import import_module
+import tempfile
+from importlib.metadata import PackageNotFoundError
+from importlib.metadata import version as dist_version
 from importlib.util import find_spec
-from textwrap import dedent
-from typing import List
+from typing import Callable, List
+
+# This list contains tuples of (import_name, package_name)
+# We look for the import_name spec and if we can't find it, then we require the user to install package_name
+# PyQt5 seems to be a bit complicated, so we look for PyQt5.QtCore to make sure the pacakge is properly installed
+_DEPENDENCIES = [
+    ('nptyping', 'nptyping==2.5.0'),
+    ('numpy', 'numpy==1.26.4'),
+    ('packaging', 'packaging==24.0'),
+    ('PIL', 'Pillow==10.3.0'),
+    ('PyInstaller', 'pyinstaller==5.13.2'),
+    ('PyQt5.QtCore', 'pyqt5==5.15.9'),
+]
+
+
+def _get_installed_version(dist_name: str) -> str | None:
+    """Return the installed version of the given distribution, or None if it's not installed.
+
+    We read the version from the installed package metadata rather than importing the
+    module, because importing things like numpy and PyQt5 just to check a string is slow.
+    """
+    try:
+        return dist_version(dist_name)
+    except PackageNotFoundError:
+        return None
 
 
 def check_dependencies() -> None:
     """Check that all dependencies are installed and if they're not, print an error and the command to install them."""
-    # This list contains tuples of (import_name, package_name, version_attr)
-    # We look for the import_name spec and if we can't find it, then we require the user to install package_name
-    # PyQt5 seems to be a bit complicated, so we look for PyQt5.QtCore to make sure the pacakge is properly installed
-    dependencies = [
-        ('nptyping', 'nptyping==2.5.0', '__version__'),
-        ('numpy', 'numpy==1.26.4', '__version__'),
-        ('packaging', 'packaging==24.0', '__version__'),
-        ('PIL', 'Pillow==10.3.0', '__version__'),
-        ('PyInstaller', 'pyinstaller==5.13.2', '__version__'),
-        ('PyQt5.QtCore', 'pyqt5==5.15.9', 'PYQT_VERSION_STR'),
+    # If we've already checked this exact list of dependencies with this interpreter and these installed
+    # versions, then we don't need to look for everything again. Reading the installed versions from
+    # the package metadata is cheap, and it invalidates the marker if anything is installed or removed
+    installed_versions = [
+        _get_installed_version(package_name.split('==')[0])
+        for _, package_name in _DEPENDENCIES
     ]
+    installed_versions.append(_get_installed_version('lintrans'))
+    key = hashlib.sha1(repr((sys.executable, _DEPENDENCIES, installed_versions)).encode()).hexdigest()[:12]
+    version = '.'.join(str(x) for x in sys.version_info[:2])
+    marker = os.path.join(tempfile.gettempdir(), f'lintrans-deps-{key}-{version}')
+
+    if os.path.isfile(marker) and os.path.getmtime(marker) >= os.path.getmtime(sys.executable):
+        return
+
     unmet = []
 
     # Thanks to David Beazley for teaching me how Python imports work
     # https://www.youtube.com/watch?v=0oTh1CXRaQ0
 
-    for import_name, package_name, version_attr in dependencies:
+    for import_name, package_name in _DEPENDENCIES:
         # We don't have to import the module, we can just check if we COULD import it
         if find_spec(import_name) is None:
             unmet.append(shlex.quote(package_name))
@@ -46,15 +79,15 @@ def check_dependencies() -> None:
         else:
             # Even if it's installed, we need the right version
             # (I'm looking at you, nptyping)
-            expected_version = package_name.split('==')[1]
+            dist_name, expected_version = package_name.split('==')
 
-            # This line imports the module and checks its version attribute, all programmatically
-            if getattr(import_module(import_name), version_attr) != expected_version:
+            if _get_installed_version(dist_name) != expected_version:
                 unmet.append(shlex.quote(package_name))
 
     lintrans_needed = find_spec('lintrans') is None
 
     if len(unmet) == 0 and not lintrans_needed:
+        open(marker, 'w', encoding='utf-8').close()
         return
 
     command = f'{sys.executable} -m pip install {" ".join(unmet)}'
@@ -65,7 +98,8 @@ def check_dependencies() -> None:
 
         command += ' -e .'
 
-    print(' ERROR: Unmet dependencies '.center(os.get_terminal_size().columns, '='))
+    # shutil.get_terminal_size() falls back to a sensible default when stdout isn't a terminal, like in CI
+    print(' ERROR: Unmet dependencies '.center(shutil.get_terminal_size((80, 24)).columns, '='))
     print()
     print('Please run the following command to install the needed dependencies:')
     print('  ' + command)
@@ -75,11 +109,111 @@ def check_dependencies() -> None:
     sys.exit(1)
 
 
-check_dependencies()
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_ICON_SRC = os.path.join(_HERE, 'src', 'lintrans', 'gui', 'assets', 'icon.jpg')
+_ICON_DEST = os.path.join('.', 'lintrans', 'gui', 'assets')
+_ADD_DATA_ARG = os.pathsep.join([_ICON_SRC, _ICON_DEST])
+
+_CACHE_DIR = os.path.join(_HERE, '.pyinstaller-cache')
+
+_SHORT_VERSION_RE = re.compile(r'v?(\d+\.\d+\.\d+)(-[^ ]+)?')
+
+# These templates are filled in with str.format() when compiling
+_WINDOWS_VERSION_INFO_TEMPLATE = '''
+VSVersionInfo(
+  ffi=FixedFileInfo(
+    filevers=({version_tuple}),
+    prodvers=({version_tuple}),
+    mask=0x3f,
+    flags={flags},
+    OS=0x40004,
+    fileType=0x1,
+    subtype=0x0,
+    date=(0, 0)
+  ),
+  kids=[
+    StringFileInfo(
+      [
+        StringTable(
+          '040904B0',
+          kids=[
+            StringStruct('CompanyName', 'D. Dyson (DoctorDalek1963)'),
+            StringStruct('FileDescription', 'lintrans'),
+            StringStruct('FileVersion', '{version_name}'),
+            StringStruct('InternalName', 'lintrans'),
+            StringStruct('LegalCopyright', '(C) D. Dyson (DoctorDalek1963) under GPLv3'),
+            StringStruct('OriginalFilename', '{filename}.exe'),
+            StringStruct('ProductName', 'lintrans'),
+            StringStruct('ProductVersion', '{version_name}')
+          ]
+        )
+      ]
+    ),
+    VarFileInfo([VarStruct('Translation', [2057, 1200])])
+  ]
+)
+'''[1:]
+
+_MACOS_INFO_PLIST_TEMPLATE = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd"
+<plist version="1.0">
+<dict>
+    <key>CFBundleDisplayName</key>
+    <string>lintrans</string>
+    <key>CFBundleExecutable</key>
+    <string>lintrans</string>
+    <key>CFBundleIconFile</key>
+    <string>icon-windowed.icns</string>
+    <key>CFBundleIdentifier</key>
+    <string>lintrans</string>
+    <key>CFBundleInfoDictionaryVersion</key>
+    <string>6.0</string>
+    <key>CFBundleName</key>
+    <string>lintrans</string>
+    <key>CFBundleType</key>
+    <string>APPL</string>
+    <key>CFBundleVersion</key>
+    <string>{version_name}</string>
+    <key>CFBundleShortVersionString</key>
+    <string>{short_version_name}</string>
+    <key>NSHighResolutionCapable</key>
+    <true/>
+    <key>NSHumanReadableCopyright</key>
+    <string>(C) D. Dyson (DoctorDalek1963) under GPLv3</string>
+</dict>
+</plist>
+'''[1:]
+
+
+def _remove_tree(*paths: str) -> None:
+    """Recursively remove the given directories.
+
+    On POSIX, we use a single ``rm -rf`` because it's much faster than :func:`shutil.rmtree`
+    for the thousands of small files that PyInstaller creates.
+    """
+    if os.name == 'posix':
+        subprocess.run(['rm', '-rf', *paths], check=True)
+        return
+
+    def _make_writable_and_retry(func: Callable[[str], object], path: str, _: object) -> None:
+        # Windows refuses to delete read-only files, so we make them writable and try again
+        os.chmod(path, stat.S_IWRITE)
+        func(path)
+
+    for path in paths:
+        shutil.rmtree(path, onerror=_make_writable_and_retry)
+
+
+def _write_bytes(filename: str, data: bytes) -> None:
+    """Write the given data to the file with a single system call, bypassing Python's buffered IO."""
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
 
-from PyInstaller.__main__ import run as run_pyi
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
 
-import lintrans
 
 OS_NAME_DICT = {
     'darwin': 'macOS',
@@ -91,15 +225,32 @@ OS_NAME_DICT = {
 class Compiler:
     """A simple class to encapsulate compilation logic."""
 
+    __slots__ = ('version_name', 'platform', 'filename', 'clean', 'purge', '_impl')
+
     def __init__(
             self, *,
             fullname: bool,
-            version_name: str
+            version_name: str,
+            clean: bool = False,
+            purge: bool = False
     ):
         """Create a Compiler object."""
         self.version_name = version_name
         self.platform = sys.platform
 
+        # We work out how to compile straight away so that we fail fast on an unsupported OS
+        try:
+            self._impl: Callable[[], None] = {
+                'darwin': self._compile_macos,
+                'linux': self._compile_linux,
+                'win32': self._compile_windows
+            }[self.platform]
+        except KeyError as e:
+            raise ValueError(f'Unsupported operating system "{self.platform}"') from e
+
+        self.clean = clean
+        self.purge = purge
+
         if fullname:
             self.filename = f'lintrans-{OS_NAME_DICT[self.platform]}-{self.version_name}'
         else:
@@ -109,16 +260,60 @@ class Compiler:
 
     def __repr__(self) -> str:
         """Return a simple repr of the object."""
-        return f'Compiler(filename={self.filename}, version_name={self.version_name}, platform={self.platform})'
+        return f'Compiler(filename={self.filename}, version_name={self.version_name}, platform={self.platform}, ' \
+            f'clean={self.clean}, purge={self.purge})'
+
+    def _get_artifact_name(self) -> str:
+        """Return the name of the final compiled artifact for this platform."""
+        return {
+            'darwin': self.filename + '.app',
+            'linux': self.filename,
+            'win32': self.filename + '.exe'
+        }[self.platform]
+
+    def _get_cache_key(self) -> str:
+        """Return a hash of everything that affects the compiled artifact.
+
+        This includes all the source files, the requirements, this script, the compiler's own settings,
+        the Python interpreter, and the installed versions of the dependencies that get bundled.
+        """
+        installed_versions = [
+            (package_name, _get_installed_version(package_name.split('==')[0]))
+            for _, package_name in _DEPENDENCIES
+        ]
+        sha = hashlib.sha256(repr((
+            self.platform,
+            self.filename,
+            self.version_name,
+            sys.version,
+            sys.executable,
+            installed_versions
+        )).encode())
+
+        paths = sorted(glob.glob(os.path.join(_HERE, 'src', 'lintrans', '**', '*'), recursive=True))
+        paths += [os.path.join(_HERE, 'requirements.txt'), os.path.abspath(__file__)]
+
+        for path in paths:
+            if os.path.isfile(path) and '__pycache__' not in path:
+                sha.update(os.path.relpath(path, _HERE).encode())
+                with open(path, 'rb') as f:
+                    sha.update(f.read())
+
+        return sha.hexdigest()
 
     def _windows_generate_version_info(self) -> None:
         """Generate version_info.txt for Windows."""
-        if (m := re.match(r'v?(\d+)\.(\d+)\.(\d+)(-[^ ]+)?', self.version_name)) is not None:
-            major, minor, patch, dev_part = m.groups()
+        # The version name is always of the form v?MAJOR.MINOR.PATCH(-suffix)?
+        # so we can just split it up rather than using a RegEx
+        head, _, dev = self.version_name.removeprefix('v').partition('-')
+        parts = head.split('.')
 
-        else:
+        if len(parts) != 3 or not all(p.isdigit() for p in parts):
             raise ValueError('Tag name must match format')
 
+        major, minor, patch = parts
+        dev_part = '-' + dev if dev else None
+
         if dev_part is not None:
             flags = '0x2'
         else:
@@ -128,43 +323,14 @@ class Compiler:
 
         print(f'Generating Windows version file with tuple=({version_tuple}) and dev_part={dev_part}')
 
-        version_info = dedent(f'''
-        VSVersionInfo(
-          ffi=FixedFileInfo(
-            filevers=({version_tuple}),
-            prodvers=({version_tuple}),
-            mask=0x3f,
-            flags={flags},
-            OS=0x40004,
-            fileType=0x1,
-            subtype=0x0,
-            date=(0, 0)
-          ),
-          kids=[
-            StringFileInfo(
-              [
-                StringTable(
-                  '040904B0',
-                  kids=[
-                    StringStruct('CompanyName', 'D. Dyson (DoctorDalek1963)'),
-                    StringStruct('FileDescription', 'lintrans'),
-                    StringStruct('FileVersion', '{self.version_name}'),
-                    StringStruct('InternalName', 'lintrans'),
-                    StringStruct('LegalCopyright', '(C) D. Dyson (DoctorDalek1963) under GPLv3'),
-                    StringStruct('OriginalFilename', '{self.filename}.exe'),
-                    StringStruct('ProductName', 'lintrans'),
-                    StringStruct('ProductVersion', '{self.version_name}')
-                  ]
-                )
-              ]
-            ),
-            VarFileInfo([VarStruct('Translation', [2057, 1200])])
-          ]
+        version_info = _WINDOWS_VERSION_INFO_TEMPLATE.format(
+            version_tuple=version_tuple,
+            flags=flags,
+            version_name=self.version_name,
+            filename=self.filename
         )
-        '''[1:])
 
-        with open('version_info.txt', 'w', encoding='utf-8') as f:
-            f.write(version_info)
+        _write_bytes('version_info.txt', version_info.encode('utf-8'))
 
         print('Version file written to version_info.txt')
 
@@ -172,51 +338,24 @@ class Compiler:
         """Replace the Info.plist file in the macOS app."""
         short_version_name = self.version_name
 
-        if (m := re.match(r'v?(\d+\.\d+\.\d+)(-[^ ]+)?', short_version_name)) is not None:
+        if (m := _SHORT_VERSION_RE.match(short_version_name)) is not None:
             short_version_name = m.group(1)
 
         print(f'Generating macOS Info.plist with short_version_name={short_version_name}')
 
-        new_info_plist = dedent(f'''
-        <?xml version="1.0" encoding="UTF-8"?>
-        <!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd"
-        <plist version="1.0">
-        <dict>
-            <key>CFBundleDisplayName</key>
-            <string>lintrans</string>
-            <key>CFBundleExecutable</key>
-            <string>lintrans</string>
-            <key>CFBundleIconFile</key>
-            <string>icon-windowed.icns</string>
-            <key>CFBundleIdentifier</key>
-            <string>lintrans</string>
-            <key>CFBundleInfoDictionaryVersion</key>
-            <string>6.0</string>
-            <key>CFBundleName</key>
-            <string>lintrans</string>
-            <key>CFBundleType</key>
-            <string>APPL</string>
-            <key>CFBundleVersion</key>
-            <string>{self.version_name}</string>
-            <key>CFBundleShortVersionString</key>
-            <string>{short_version_name}</string>
-            <key>NSHighResolutionCapable</key>
-            <true/>
-            <key>NSHumanReadableCopyright</key>
-            <string>(C) D. Dyson (DoctorDalek1963) under GPLv3</string>
-        </dict>
-        </plist>
-        '''[1:])
-
-        with open(os.path.join(self.filename + '.app', 'Contents', 'Info.plist'), 'w', encoding='utf-8') as f:
-            f.write(new_info_plist)
+        new_info_plist = _MACOS_INFO_PLIST_TEMPLATE.format(
+            version_name=self.version_name,
+            short_version_name=short_version_name
+        )
+
+        _write_bytes(os.path.join(self.filename + '.app', 'Contents', 'Info.plist'), new_info_plist.encode('utf-8'))
 
         print(f'Info.plist replaced in {self.filename}.app')
 
     def _get_pyi_args(self) -> List[str]:
         """Return the common args for PyInstaller."""
-        path_to_icon = os.path.join(os.path.dirname(__file__), 'src', 'lintrans', 'gui', 'assets', 'icon.jpg')
-        icon_dest = os.path.join('.', 'lintrans', 'gui', 'assets')
+        # We only pass --clean when asked, so that local rebuilds can reuse PyInstaller's cache
+        clean_args = ['--clean'] if self.clean else []
 
         return [
             'src/lintrans/__main__.py',
@@ -225,40 +364,43 @@ class Compiler:
             '--distpath=./dist',
             '--workpath=./build',
             '--noconfirm',
-            '--clean',
+            '--log-level=WARN',
+            *clean_args,
             f'--name={self.filename}',
             '--icon',
-            path_to_icon,
+            _ICON_SRC,
             '--add-data',
-            os.pathsep.join([path_to_icon, icon_dest])
+            _ADD_DATA_ARG
         ]
 
     def _compile_macos(self) -> None:
         """Compile for macOS."""
+        from PyInstaller.__main__ import run as run_pyi
+
         run_pyi(self._get_pyi_args())
 
+        # The .app is a directory, which os.replace() can't overwrite if it's not empty
         new_path = self.filename + '.app'
-        if os.path.isfile(new_path):
-            os.remove(new_path)
+        if os.path.isdir(new_path):
+            _remove_tree(new_path)
 
-        os.rename(os.path.join('dist', self.filename + '.app'), new_path)
+        os.replace(os.path.join('dist', self.filename + '.app'), new_path)
 
         self._macos_replace_info_plist()
 
     def _compile_linux(self) -> None:
         """Compile for Linux."""
-        run_pyi(self._get_pyi_args())
+        from PyInstaller.__main__ import run as run_pyi
 
-        if os.path.isfile(self.filename):
-            os.remove(self.filename)
+        run_pyi(self._get_pyi_args())
 
-        os.rename(os.path.join('dist', self.filename), self.filename)
+        os.replace(os.path.join('dist', self.filename), self.filename)
 
     def _compile_windows(self) -> None:
         """Compile for Windows."""
-        self._windows_generate_version_info()
+        from PyInstaller.__main__ import run as run_pyi
 
-        assert os.path.isfile('version_info.txt'), 'version_info.txt must exist for Windows compilation'
+        self._windows_generate_version_info()
 
         run_pyi([
             *self._get_pyi_args(),
@@ -268,35 +410,85 @@ class Compiler:
 
         os.remove('version_info.txt')
 
-        new_path = self.filename + '.exe'
-        if os.path.isfile(new_path):
-            os.remove(new_path)
+        os.replace(os.path.join('dist', self.filename + '.exe'), self.filename + '.exe')
 
-        os.rename(os.path.join('dist', self.filename + '.exe'), new_path)
+    @staticmethod
+    def _cache_artifact(artifact: str, cache_entry: str) -> None:
+        """Copy the artifact into the given cache entry directory.
+
+        We copy into a temporary sibling directory and then move that into place, so that
+        an interrupted copy can never leave a partial artifact behind to be reused later.
+        """
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        temp_entry = tempfile.mkdtemp(prefix='.tmp-', dir=_CACHE_DIR)
+
+        try:
+            if os.path.isdir(artifact):
+                shutil.copytree(artifact, os.path.join(temp_entry, artifact), symlinks=True)
+            else:
+                shutil.copy2(artifact, os.path.join(temp_entry, artifact))
+
+            # We only keep the most recent artifact, so the cache doesn't grow forever
+            stale_entries = [
+                os.path.join(_CACHE_DIR, name)
+                for name in os.listdir(_CACHE_DIR)
+                if os.path.join(_CACHE_DIR, name) != temp_entry
+            ]
+            if stale_entries:
+                _remove_tree(*stale_entries)
+
+            os.replace(temp_entry, cache_entry)
+        except BaseException:
+            _remove_tree(temp_entry)
+            raise
+
+        print(f'Compiled artifact cached in {os.path.join(cache_entry, artifact)}')
 
     def compile(self) -> None:
-        """Compile for the appropriate operating system."""
-        print(f'Compiling for platform={self.platform}')
-        if self.platform == 'darwin':
-            self._compile_macos()
+        """Compile for the appropriate operating system.
 
-        elif self.platform == 'linux':
-            self._compile_linux()
+        If nothing has changed since a previous compilation, then we just copy
+        the cached artifact from that compilation, unless we're cleaning.
+        """
+        artifact = self._get_artifact_name()
+        cached_artifact = os.path.join(_CACHE_DIR, self._get_cache_key(), artifact)
 
-        elif self.platform == 'win32':
-            self._compile_windows()
+        if os.path.exists(cached_artifact) and not self.clean:
+            print(f'Sources unchanged, so reusing {cached_artifact}')
 
-        else:
-            raise ValueError(f'Unsupported operating system "{self.platform}"')
+            if os.path.isdir(artifact):
+                _remove_tree(artifact)
+
+            if os.path.isdir(cached_artifact):
+                shutil.copytree(cached_artifact, artifact, symlinks=True)
+            else:
+                shutil.copy2(cached_artifact, artifact)
+
+            return
+
+        print(f'Compiling for platform={self.platform}')
+        self._impl()
 
         print('Compilation finished')
 
-        shutil.rmtree('dist')
-        shutil.rmtree('build')
+        # The final artifact has already been moved out of dist/, so we can always remove it,
+        # but we keep build/ unless we're purging, so that PyInstaller can reuse its analysis
         os.remove(self.filename + '.spec')
 
+        if self.purge:
+            _remove_tree('dist', 'build')
+        else:
+            _remove_tree('dist')
+
         print('Auxiliary files cleaned up')
 
+        # A clean build asks us not to trust the cache, and CI runners start from scratch
+        # every time, so in either case a cached copy could never be reused
+        if self.clean or os.environ.get('CI'):
+            return
+
+        self._cache_artifact(artifact, os.path.dirname(cached_artifact))
+
 
 def main() -> None:
     """Run any pre-compilation, and then compile."""
@@ -313,9 +505,35 @@ def main() -> None:
         help='whether to use the fullname for compilation (lintrans-platform-version) or the short name (lintrans)'
     )
 
+    parser.add_argument(
+        '--clean',
+        required=False,
+        default=False,
+        action='store_true',
+        help='whether to clean the PyInstaller cache before compiling, rather than reusing it'
+    )
+
+    parser.add_argument(
+        '--purge',
+        required=False,
+        default=False,
+        action='store_true',
+        help='whether to remove the PyInstaller build directory after compiling, rather than keeping it for next time'
+    )
+
     args = parser.parse_args()
 
-    compiler = Compiler(fullname=args.fullname, version_name=lintrans.__version__)
+    # We only check the dependencies and import anything heavy once we know we're actually compiling
+    check_dependencies()
+
+    import lintrans
+
+    compiler = Compiler(
+        fullname=args.fullname,
+        version_name=lintrans.__version__,
+        clean=args.clean,
+        purge=args.purge
+    )
     compiler.compile()
 
 
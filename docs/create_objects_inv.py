@@ -28,12 +28,24 @@ The version_name should not contain a leading ``v``.
 .. note:: The URIs MUST have .html suffices
 """
 
+import hashlib
+import os
 import re
-from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+from itertools import starmap
 
 import sphobjinv as soi
 
-pattern = re.compile(r'^(\S+)\s+([^:\s]+):([^:\s]+)\s+(-?\d+)\s+(\S+)\s+(\S+)$')
+# We use [^\S\n] rather than \s so that a single match can never span multiple lines
+pattern = re.compile(r'^(\S+)[^\S\n]+([^:\s]+):([^:\s]+)[^\S\n]+(-?\d+)[^\S\n]+(\S+)[^\S\n]+(\S+)$', re.M)
+_PROJECT_RE = re.compile(r'^PROJECT=(.+)$')
+_VERSION_RE = re.compile(r'^VERSION=([^v][\d.]+)$')
+
+
+def _get_script_hash() -> str:
+    """Return a hash of this script and the version of sphobjinv, since changing either could change the output."""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(soi.__version__.encode() + f.read()).hexdigest()
 
 
 def generate_objects_inv(prefix: str) -> None:
@@ -42,48 +54,81 @@ def generate_objects_inv(prefix: str) -> None:
     We read from ``prefix-objects.txt`` and write to ``prefix-objects.inv``,
     so if you want to use ``pyqt5-objects.txt``, then the prefix should be ``pyqt5``.
 
-    :param str prefix: The prefix for the object files
+    If the text file hasn't changed since we last generated the inventory file, then
+    we don't generate it again. We check this with a hash stored next to the inventory,
+    which also covers this script and the version of sphobjinv.
 
+    :param str prefix: The prefix for the object files
     :raises ValueError: If the file doesn't match the format
     """
-    inv = soi.Inventory()
+    with open(prefix + '-objects.txt', 'rb') as f:
+        raw_text = f.read()
+
+    text_hash = hashlib.sha256(_get_script_hash().encode() + raw_text).hexdigest()
+    inv_filename = f'source/{prefix}-objects.inv'
+    hash_filename = inv_filename + '.hash'
 
-    with open(prefix + '-objects.txt', 'r', encoding='utf-8') as f:
-        text = f.read().splitlines()
+    if os.path.isfile(inv_filename) and os.path.isfile(hash_filename):
+        with open(hash_filename, 'r', encoding='utf-8') as f:
+            if f.read() == text_hash:
+                return
+
+    print(f'Generating {prefix}-objects.inv')
+
+    inv = soi.Inventory()
+    text = raw_text.decode('utf-8').splitlines()
 
     # Remove blank lines and comments
     text = [x for x in text if x != '' and not x.lstrip().startswith('#')]
 
     try:
-        inv.project = re.match(r'^PROJECT=(.+)$', text[0]).group(1)
+        inv.project = _PROJECT_RE.match(text[0]).group(1)
     except (AttributeError, IndexError):
         raise ValueError(f'The first line of {prefix}-objects.txt must be of the form "PROJECT=project_name"')
 
     try:
-        inv.version = re.match(r'^VERSION=([^v][\d.]+)$', text[1]).group(1)
+        inv.version = _VERSION_RE.match(text[1]).group(1)
     except (AttributeError, IndexError):
         raise ValueError(f'The second line of {prefix}-objects.txt must be of the form "VERSION=version_number"')
 
-    for line in text[2:]:
-        if (match := re.match(pattern, line)) is None:
-            raise ValueError(f'Every line in {prefix}-objects.txt must match the pattern')
+    # We scan all the lines in one go, and if any line didn't match, then we'll have fewer matches than lines
+    body = text[2:]
+    matches = list(pattern.finditer('\n'.join(body)))
 
-        name, domain, role, priority, uri, disp_name = match.groups()
+    if len(matches) != len(body):
+        raise ValueError(f'Every line in {prefix}-objects.txt must match the pattern')
 
-        inv.objects.append(soi.DataObjStr(
-            name=name, domain=domain, role=role, priority=priority, uri=uri, dispname=disp_name
-        ))
+    # The groups are in the same order as the positional arguments of DataObjStr:
+    # (name, domain, role, priority, uri, dispname)
+    inv.objects.extend(starmap(soi.DataObjStr, (m.groups() for m in matches)))
 
     compressed_text = soi.compress(inv.data_file(contract=True))
-    soi.writebytes(f'source/{prefix}-objects.inv', compressed_text)
+    soi.writebytes(inv_filename, compressed_text)
+
+    with open(hash_filename, 'w', encoding='utf-8') as f:
+        f.write(text_hash)
 
 
 def main() -> None:
-    """Call :func:`generate_objects_inv` for every file matching the glob pattern '*-objects.txt'."""
-    for filename in glob('*-objects.txt'):
-        prefix = filename[:-12]
-        print(f'Generating {prefix}-objects.inv')
-        generate_objects_inv(prefix)
+    """Call :func:`generate_objects_inv` for every file matching the glob pattern '*-objects.txt'.
+
+    Every file is independent, so if there's more than one, we generate them all in parallel.
+    """
+    with os.scandir('.') as entries:
+        prefixes = [
+            entry.name[:-12] for entry in entries
+            if entry.name.endswith('-objects.txt') and entry.is_file()
+        ]
+
+    # Starting a process pool costs more than it saves for a single file
+    if len(prefixes) <= 1:
+        for prefix in prefixes:
+            generate_objects_inv(prefix)
+        return
+
+    with ProcessPoolExecutor() as executor:
+        # We consume the iterator so that any exceptions get raised here
+        list(executor.map(generate_objects_inv, prefixes))
 
 
 if __name__ == '__main__':
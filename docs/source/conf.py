@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import inspect
 import os
+from functools import lru_cache
 from importlib import import_module
 from typing import Dict, List, Optional
 
@@ -104,11 +105,14 @@ else:
 
 
 def _source_read_handler(app: Sphinx, docname: str, source: List[str]) -> None:
+    # We check for the token first so that we don't copy the whole source when there's nothing to replace
     if docname.startswith('compilation/'):
-        source[0] = source[0].replace('VERSION_NUMBER', lintrans.__version__)
+        if 'VERSION_NUMBER' in source[0]:
+            source[0] = source[0].replace('VERSION_NUMBER', lintrans.__version__)
 
     elif 'index' in docname and not tags.has('include_compilation'):
-        source[0] = source[0].replace('\n   compilation/index', '')
+        if '\n   compilation/index' in source[0]:
+            source[0] = source[0].replace('\n   compilation/index', '')
 
 
 def setup(app: Sphinx) -> None:
@@ -124,10 +128,15 @@ def linkcode_resolve(domain: str, info: Dict[str, str]) -> Optional[str]:
     if domain != 'py':
         return None
 
+    return _resolve_github_link(info['module'], info['fullname'])
+
+
+@lru_cache(maxsize=None)
+def _resolve_github_link(module_name: str, fullname: str) -> Optional[str]:
+    """Return the GitHub link for the given object, caching it because Sphinx asks for the same objects repeatedly."""
     # Take the module and fullname and get the class or funtion object
-    module_name = info['module']
     thing = import_module(module_name)
-    for part in info['fullname'].split('.'):
+    for part in fullname.split('.'):
         thing = getattr(thing, part)
 
     # We can then inspect the object to find out where it's defined so we can link directly to it
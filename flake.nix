@@ -43,12 +43,6 @@
             // args);
 
         python311-packages = rec {
-          singleton-decorator = buildPy311Package {
-            pname = "singleton-decorator";
-            version = "1.0.0";
-            hash = "sha256-GpCtiopzi+WRycFn/dZ3xdSkPRvGscEoInvhxeA77gc=";
-          };
-
           pytest-custom-exit-code = buildPy311Package {
             pname = "pytest-custom_exit_code";
             version = "0.3.0";
@@ -138,7 +132,6 @@
           p.packaging
           p.pip # TODO: Remove pip
           p.pyqt5
-          python311-packages.singleton-decorator
         ];
 
         python-compile-libs = p: [
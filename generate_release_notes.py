@@ -8,6 +8,8 @@
 
 """A very simple script to generate release notes."""
 
+import mmap
+import os
 import re
 import sys
 
@@ -36,16 +38,13 @@ The Linux binary is a dynamically linked ELF compiled on Ubuntu 20.04 and may or
 CHANGELOG
 '''
 
-# This RegEx is complicated because of the newlines
-# It requires the current tag to have a header like
+# We find the notes for a tag by looking for its header, which must look like
 # ## [0.2.1] - 2022-03-22
-# And all other tags to have similar headers
+# And then taking everything up to the next header, which must look similar
 # It also won't work on the first tag, but that's fine
-RE_PATTERN = r'''(?<=## \[TAG_NAME\] - \d{4}-\d{2}-\d{2}
-
-).*?(?=
-
-## \[\d+\.\d+\.\d+(-[\S]+)?\] - \d{4}-\d{2}-\d{2})'''
+# We only use these small RegExes to validate the headers that we find
+_DATE_RE = re.compile(rb'\d{4}-\d{2}-\d{2}\n\n')
+_NEXT_HEADER_RE = re.compile(rb'\n\n## \[\d+\.\d+\.\d+(-\S+)?\] - \d{4}-\d{2}-\d{2}')
 
 
 def main(args: list[str]) -> None:
@@ -57,22 +56,28 @@ def main(args: list[str]) -> None:
 
     print(f'Generating release notes for tag {tag_name}')
 
-    with open('CHANGELOG.md', 'r', encoding='utf-8') as f:
-        changelog_text = f.read()
+    header = f'## [{tag_name[1:]}] - '.encode()
+
+    # We search a memory map of the file so that we only have to decode the part we actually want
+    with open('CHANGELOG.md', 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as changelog:
+        if (start := changelog.find(header)) == -1 \
+                or (date := _DATE_RE.match(changelog, start + len(header))) is None \
+                or (end := changelog.find(b'\n\n## [', date.end())) == -1 \
+                or _NEXT_HEADER_RE.match(changelog, end) is None:
+            raise ValueError('Error in searching for changelog notes. Bad format')
+
+        changelog_notes = changelog[date.end():end].decode('utf-8')
 
-    if (m := re.search(
-        RE_PATTERN.replace('TAG_NAME', re.escape(tag_name[1:])),
-        changelog_text,
-        flags=re.S
-    )) is not None:
-        text = TEXT.replace('CHANGELOG', m.group(0))
-        text = text.replace('VERSION_RTD', tag_name)
+    text = TEXT.replace('CHANGELOG', changelog_notes)
+    text = text.replace('VERSION_RTD', tag_name)
 
-    else:
-        raise ValueError('Error in searching for changelog notes. Bad format')
+    # This is a small file, so we write it with a single system call
+    fd = os.open('release_notes.md', os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
 
-    with open('release_notes.md', 'w', encoding='utf-8') as f:
-        f.write(text)
+    try:
+        os.write(fd, text.encode('utf-8'))
+    finally:
+        os.close(fd)
 
 
 if __name__ == '__main__':
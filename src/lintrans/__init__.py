@@ -4,11 +4,35 @@
 # This program is licensed under GNU GPLv3, available here:
 # <https://www.gnu.org/licenses/gpl-3.0.html>
 
-"""This is the top-level ``lintrans`` package, which contains all the subpackages of the project."""
+"""This is the top-level ``lintrans`` package, which contains all the subpackages of the project.
 
-from . import (crash_reporting, global_settings, gui, matrices, typing_,
-               updating)
+The subpackages are imported lazily when they're first accessed, so that something like
+``lintrans.__version__`` doesn't have to import PyQt5 and everything else.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import (crash_reporting, global_settings, gui, matrices, typing_,
+                   updating)
 
 __version__ = '0.4.2-alpha'
 
 __all__ = ['crash_reporting', 'global_settings', 'gui', 'matrices', 'typing_', 'updating', '__version__']
+
+
+def __getattr__(name: str) -> ModuleType:
+    """Import and return the subpackage called ``name`` the first time that it's accessed.
+
+    :raises AttributeError: If there is no subpackage called ``name``
+    """
+    if name in __all__:
+        module = importlib.import_module(f'.{name}', __name__)
+        globals()[name] = module
+        return module
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -8,12 +8,35 @@
 
 """This module provides a :func:`main` function to interpret command line arguments and run the program."""
 
-from argparse import ArgumentParser
+import sys
 from textwrap import dedent
+from typing import List
 
 from lintrans import __version__, gui
 from lintrans.crash_reporting import set_excepthook, set_signal_handler
 
+_HELP_FLAGS = frozenset({'-h', '--help'})
+_VERSION_FLAGS = frozenset({'-V', '--version'})
+
+_HELP_TEXT = dedent('''
+    Usage: lintrans [option] [filename]
+
+    Arguments:
+        filename         The name of a session file to open
+
+    Options:
+        -h, --help       Display this help text and exit
+        -V, --version    Display the version information and exit'''[1:])
+
+_VERSION_TEXT = dedent(f'''
+    lintrans (version {__version__})
+    The linear transformation visualizer
+
+    Copyright (C) 2021-2022 D. Dyson (DoctorDalek1963)
+
+    This program is licensed under GNU GPLv3, available here:
+    <https://www.gnu.org/licenses/gpl-3.0.html>'''[1:])
+
 
 def main() -> None:
     """Interpret program-specific command line arguments and run the main window in most cases.
@@ -23,6 +46,33 @@ def main() -> None:
 
     :param List[str] args: The full argument list (including program name)
     """
+    args = sys.argv[1:]
+
+    # Most of the time, there are no arguments or just one flag,
+    # so we can avoid the cost of building an ArgumentParser
+    if len(args) == 0:
+        gui.main(None)
+
+    elif len(args) == 1 and args[0] in _HELP_FLAGS:
+        print(_HELP_TEXT)
+
+    elif len(args) == 1 and args[0] in _VERSION_FLAGS:
+        print(_VERSION_TEXT)
+
+    else:
+        _parse_args_and_run(args)
+
+
+def _parse_args_and_run(args: List[str]) -> None:
+    """Parse the command line arguments with :mod:`argparse` and act on them.
+
+    This is only needed for anything more complicated than a single flag, so we
+    keep it out of :func:`main` to avoid importing :mod:`argparse` most of the time.
+
+    :param List[str] args: The command line arguments (not including the program name)
+    """
+    from argparse import ArgumentParser
+
     parser = ArgumentParser(add_help=False)
 
     parser.add_argument(
@@ -46,29 +96,14 @@ def main() -> None:
         action='store_true'
     )
 
-    parsed_args = parser.parse_args()
+    parsed_args = parser.parse_args(args)
 
     if parsed_args.help:
-        print(dedent('''
-        Usage: lintrans [option] [filename]
-
-        Arguments:
-            filename         The name of a session file to open
-
-        Options:
-            -h, --help       Display this help text and exit
-            -V, --version    Display the version information and exit'''[1:]))
+        print(_HELP_TEXT)
         return
 
     if parsed_args.version:
-        print(dedent(f'''
-        lintrans (version {__version__})
-        The linear transformation visualizer
-
-        Copyright (C) 2021-2022 D. Dyson (DoctorDalek1963)
-
-        This program is licensed under GNU GPLv3, available here:
-        <https://www.gnu.org/licenses/gpl-3.0.html>'''[1:]))
+        print(_VERSION_TEXT)
         return
 
     gui.main(parsed_args.filename)
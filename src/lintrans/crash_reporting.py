@@ -18,24 +18,26 @@ import platform
 import signal
 import sys
 from datetime import datetime
+from functools import lru_cache
 from signal import SIGABRT, SIGFPE, SIGILL, SIGSEGV, SIGTERM
-from textwrap import indent
 from types import FrameType, TracebackType
-from typing import NoReturn, Type
-
-from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
-from PyQt5.QtWidgets import QApplication
+from typing import TYPE_CHECKING, List, NoReturn, TextIO, Tuple, Type
 
 import lintrans
 from lintrans.typing_ import is_matrix_type
 
 from .global_settings import GlobalSettings
-from .gui.main_window import LintransMainWindow
+
+# The GUI is only needed once we've actually crashed, so the functions that use it import it themselves
+if TYPE_CHECKING:
+    from .gui.main_window import LintransMainWindow
+
+_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 
 def _get_datetime_string() -> str:
     """Get the date and time as a string with a space in the middle."""
-    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return datetime.now().strftime(_DATETIME_FORMAT)
 
 
 def _get_main_window() -> LintransMainWindow:
@@ -43,29 +45,51 @@ def _get_main_window() -> LintransMainWindow:
 
     :raises RuntimeError: If there is not exactly 1 instance of :class:`~lintrans.gui.main_window.LintransMainWindow`
     """
-    widgets = [
-        x for x in QApplication.topLevelWidgets()
-        if isinstance(x, LintransMainWindow)
-    ]
+    from PyQt5.QtWidgets import QApplication
+
+    from .gui.main_window import LintransMainWindow
+
+    # There should only ever be one main window, so we stop building a list and just remember the one we found
+    main_window: LintransMainWindow | None = None
 
-    if len(widgets) != 1:
-        raise RuntimeError(f'Expected 1 widget of type LintransMainWindow but found {len(widgets)}')
+    for widget in QApplication.topLevelWidgets():
+        if isinstance(widget, LintransMainWindow):
+            if main_window is not None:
+                raise RuntimeError('Expected 1 widget of type LintransMainWindow but found at least 2')
 
-    return widgets[0]
+            main_window = widget
+
+    if main_window is None:
+        raise RuntimeError('Expected 1 widget of type LintransMainWindow but found 0')
+
+    return main_window
+
+
+@lru_cache(maxsize=None)
+def _get_platform_info() -> Tuple[str, str]:
+    """Return the Python version and platform string.
+
+    These never change while we're running, so we only compute them once, but we wait until
+    the first crash report because :func:`platform.platform` is too slow to call at startup.
+    """
+    return platform.python_version(), platform.platform()
 
 
 def _get_system_info() -> str:
     """Return a string of all the system we could gather."""
-    info = 'SYSTEM INFO:\n'
+    from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
 
-    info += f'  lintrans: {lintrans.__version__}\n'
-    info += f'  Python: {platform.python_version()}\n'
-    info += f'  Qt5: {QT_VERSION_STR}\n'
-    info += f'  PyQt5: {PYQT_VERSION_STR}\n'
-    info += f'  Platform: {platform.platform()}\n'
+    python_version, platform_string = _get_platform_info()
 
-    info += '\n'
-    return info
+    return ''.join([
+        'SYSTEM INFO:\n',
+        f'  lintrans: {lintrans.__version__}\n',
+        f'  Python: {python_version}\n',
+        f'  Qt5: {QT_VERSION_STR}\n',
+        f'  PyQt5: {PYQT_VERSION_STR}\n',
+        f'  Platform: {platform_string}\n',
+        '\n'
+    ])
 
 
 def _get_error_origin(
@@ -96,7 +120,7 @@ def _get_error_origin(
     :type signal_number: int | None
     :type stack_frame: types.FrameType | None
     """
-    origin = 'CRASH ORIGIN:\n'
+    origin = ['CRASH ORIGIN:\n']
 
     if exc_type is not None and exc_value is not None and traceback is not None:
         # We want the frame where the exception actually occurred, so we have to descend the traceback
@@ -107,42 +131,52 @@ def _get_error_origin(
 
         frame = tb.tb_frame
 
-        origin += f'  Exception "{exc_value}"\n  of type {exc_type.__name__} in call to {frame.f_code.co_name}()\n' \
+        origin.append(
+            f'  Exception "{exc_value}"\n  of type {exc_type.__name__} in call to {frame.f_code.co_name}()\n'
             f'  on line {frame.f_lineno} of {frame.f_code.co_filename}'
+        )
 
     elif signal_number is not None and stack_frame is not None:
-        origin += f'  Signal "{signal.strsignal(signal_number)}" received in call to {stack_frame.f_code.co_name}()\n' \
+        origin.append(
+            f'  Signal "{signal.strsignal(signal_number)}" received in call to {stack_frame.f_code.co_name}()\n'
             f'  on line {stack_frame.f_lineno} of {stack_frame.f_code.co_filename}'
+        )
 
     else:
-        origin += '  UNKNOWN (not exception or signal)'
+        origin.append('  UNKNOWN (not exception or signal)')
 
-    origin += '\n\n'
+    origin.append('\n\n')
 
-    return origin
+    return ''.join(origin)
 
 
-def _get_display_settings() -> str:
-    """Return a string representing all of the display settings."""
-    raw_settings = _get_main_window()._plot.display_settings
+def _get_display_settings(window: LintransMainWindow, prefix: str = '') -> str:
+    """Return a string representing all of the display settings.
+
+    :param LintransMainWindow window: The main window, as returned by :func:`_get_main_window`
+    :param str prefix: The prefix to put at the start of every line
+    """
+    raw_settings = window._plot.display_settings
     display_settings = {
         k: getattr(raw_settings, k)
         for k in raw_settings.__slots__
         if not k.startswith('_')
     }
 
-    string = 'Display settings:\n'
+    string = [f'{prefix}Display settings:\n']
 
     for setting, value in display_settings.items():
-        string += f'  {setting}: {value}\n'
+        string.append(f'{prefix}  {setting}: {value}\n')
 
-    return string
+    return ''.join(string)
 
 
-def _get_post_mortem() -> str:
-    """Return whatever post mortem data we could gather from the window."""
-    window = _get_main_window()
+def _get_post_mortem(window: LintransMainWindow, prefix: str = '  ') -> str:
+    """Return whatever post mortem data we could gather from the window.
 
+    :param LintransMainWindow window: The main window, as returned by :func:`_get_main_window`
+    :param str prefix: The prefix to put at the start of every non-blank line of the data
+    """
     try:
         matrix_wrapper = window._matrix_wrapper
         expression_history = window._expression_history
@@ -154,52 +188,76 @@ def _get_post_mortem() -> str:
     except (AttributeError, RuntimeError) as e:
         return f'UNABLE TO GET POST MORTEM DATA:\n  {e!r}\n'
 
-    post_mortem = 'Matrix wrapper:\n'
+    post_mortem = ['POST MORTEM:\n', f'{prefix}Matrix wrapper:\n']
 
     for matrix_name, matrix_value in matrix_wrapper.get_defined_matrices():
-        post_mortem += f'  {matrix_name}: '
-
         if is_matrix_type(matrix_value):
-            post_mortem += f'[{matrix_value[0][0]} {matrix_value[0][1]}; {matrix_value[1][0]} {matrix_value[1][1]}]'
+            # Converting to a list once is cheaper than indexing into the array four times
+            m = matrix_value.tolist()
+            value = f'[{m[0][0]} {m[0][1]}; {m[1][0]} {m[1][1]}]'
         else:
-            post_mortem += f'"{matrix_value}"'
+            value = f'"{matrix_value}"'
 
-        post_mortem += '\n'
+        post_mortem.append(f'{prefix}  {matrix_name}: {value}\n')
 
-    post_mortem += f'\nExpression box: "{window._lineedit_expression_box.text()}"'
-    post_mortem += f'\nCurrently displayed: [{point_i[0]} {point_j[0]}; {point_i[1]} {point_j[1]}]'
-    post_mortem += f'\nAnimating (sequence): {window._animating} ({window._animating_sequence})\n'
+    post_mortem.append(f'\n{prefix}Expression box: "{window._lineedit_expression_box.text()}"\n')
+    post_mortem.append(f'{prefix}Currently displayed: [{point_i[0]} {point_j[0]}; {point_i[1]} {point_j[1]}]\n')
+    post_mortem.append(f'{prefix}Animating (sequence): {window._animating} ({window._animating_sequence})\n')
 
-    post_mortem += f'\nExpression history (index={exp_hist_index}):'
-    post_mortem += '\n  ['
-    for item in expression_history:
-        post_mortem += f'\n    {item!r},'
-    post_mortem += '\n  ]\n'
+    post_mortem.append(f'\n{prefix}Expression history (index={exp_hist_index}):\n')
+    # The history grows for the whole session, so we format it in one go
+    history_items = ''.join(f'{prefix}    {item!r},\n' for item in expression_history)
+    post_mortem.append(f'{prefix}  [\n{history_items}{prefix}  ]\n')
 
-    post_mortem += f'\nGrid spacing: {plot.grid_spacing}'
-    post_mortem += f'\nWindow size: {window.width()} x {window.height()}'
-    post_mortem += f'\nViewport size: {plot.width()} x {plot.height()}'
-    post_mortem += f'\nGrid corner: {plot._grid_corner()}\n'
+    post_mortem.append(f'\n{prefix}Grid spacing: {plot.grid_spacing}\n')
+    post_mortem.append(f'{prefix}Window size: {window.width()} x {window.height()}\n')
+    post_mortem.append(f'{prefix}Viewport size: {plot.width()} x {plot.height()}\n')
+    post_mortem.append(f'{prefix}Grid corner: {plot._grid_corner()}\n')
 
-    post_mortem += '\n' + _get_display_settings()
+    post_mortem.append('\n' + _get_display_settings(window, prefix))
 
-    string = 'POST MORTEM:\n'
-    string += indent(post_mortem, '  ')
-    return string
+    return ''.join(post_mortem)
 
 
-def _get_crash_report(datetime_string: str, error_origin: str) -> str:
-    """Return a string crash report, ready to be written to a file and stderr.
+class _Tee:
+    """A tiny text sink that writes everything to several streams at once."""
 
+    __slots__ = ('_streams',)
+
+    def __init__(self, *streams: TextIO) -> None:
+        """Create a tee that copies everything written to it into all of the given streams."""
+        self._streams = streams
+
+    def write(self, string: str) -> None:
+        """Write the string to every stream."""
+        for stream in self._streams:
+            stream.write(string)
+
+    def flush(self) -> None:
+        """Flush every stream."""
+        for stream in self._streams:
+            stream.flush()
+
+
+def _write_crash_report(out: _Tee, datetime_string: str, error_origin: str) -> None:
+    """Write the crash report to the given sink, one section at a time.
+
+    Each section is flushed as soon as it's written, so if we die part way through
+    generating the report, we still keep all the sections that came before. We only
+    look for the main window after the header, system info, and origin are written.
+
+    :param _Tee out: Where to write the report
     :param str datetime_string: The datetime to use in the report; should be the same as the one in the filename
     :param str error_origin: The origin of the error. Get this by calling :func:`_get_error_origin`
+    :raises RuntimeError: If there is not exactly 1 instance of :class:`~lintrans.gui.main_window.LintransMainWindow`
     """
-    report = f'CRASH REPORT at {datetime_string}\n\n'
-    report += _get_system_info()
-    report += error_origin
-    report += _get_post_mortem()
+    out.write(f'CRASH REPORT at {datetime_string}\n\n')
+    out.write(_get_system_info())
+    out.write(error_origin)
+    out.flush()
 
-    return report
+    out.write(_get_post_mortem(_get_main_window()))
+    out.flush()
 
 
 def _report_crash(
@@ -217,25 +275,39 @@ def _report_crash(
     :func:`set_signal_handler`.
     """
     datetime_string = _get_datetime_string()
-
-    filename = os.path.join(
-        GlobalSettings().get_crash_reports_directory(),
-        datetime_string.replace(" ", "_") + '.log'
+    error_origin = _get_error_origin(
+        exc_type=exc_type,
+        exc_value=exc_value,
+        traceback=traceback,
+        signal_number=signal_number,
+        stack_frame=stack_frame
     )
-    report = _get_crash_report(
-        datetime_string,
-        _get_error_origin(
-            exc_type=exc_type,
-            exc_value=exc_value,
-            traceback=traceback,
-            signal_number=signal_number,
-            stack_frame=stack_frame
+
+    streams: List[TextIO] = []
+
+    # PyInstaller sets sys.stderr to None in windowed builds on Windows, so we can only use it if it exists
+    if sys.stderr is not None:
+        sys.stderr.write('\n\n')
+        streams.append(sys.stderr)
+
+    # If we can't write the log file, then we still want the report to reach stderr
+    log_file: TextIO | None
+    try:
+        filename = os.path.join(
+            GlobalSettings().get_crash_reports_directory(),
+            datetime_string.replace(" ", "_") + '.log'
         )
-    )
+        log_file = open(filename, 'w', encoding='utf-8')
+    except OSError:
+        log_file = None
+    else:
+        streams.insert(0, log_file)
 
-    print('\n\n' + report, end='', file=sys.stderr)
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(report)
+    try:
+        _write_crash_report(_Tee(*streams), datetime_string, error_origin)
+    finally:
+        if log_file is not None:
+            log_file.close()
 
     sys.exit(255)
 
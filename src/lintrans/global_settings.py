@@ -8,41 +8,67 @@
 
 from __future__ import annotations
 
+import json
 import os
 import pathlib
-import pickle
-import subprocess
 import sys
 from copy import copy
-from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 from typing import Optional, Tuple
 
-from singleton_decorator import singleton
-
 import lintrans
 
 UpdateType = Enum('UpdateType', 'auto prompt never')
 """An enum of possible update prompt types."""
 
 
-@dataclass(slots=True)
 class GlobalSettingsData:
-    """A simple dataclass to store the configurable data of the global settings."""
+    """A simple class to store the configurable data of the global settings.
+
+    This is a plain class with ``__slots__`` rather than a dataclass so that importing this
+    module at startup doesn't have to import :mod:`dataclasses`.
+    """
 
-    update_type: UpdateType = UpdateType.prompt
+    __slots__ = ('update_type', 'cursor_epsilon', 'snap_dist', 'snap_to_int_coords')
+
+    update_type: UpdateType
     """This is the desired type of update prompting."""
 
-    cursor_epsilon: int = 5
+    cursor_epsilon: int
     """This is the distance in pixels that the cursor needs to be from the point to drag it."""
 
-    snap_dist: float = 0.1
+    snap_dist: float
     """This is the distance in grid coords that the cursor needs to be from an integer point to snap to it."""
 
-    snap_to_int_coords: bool = True
+    snap_to_int_coords: bool
     """This decides whether or not vectors should snap to integer coordinates when being dragged around."""
 
+    def __init__(
+        self,
+        update_type: UpdateType = UpdateType.prompt,
+        cursor_epsilon: int = 5,
+        snap_dist: float = 0.1,
+        snap_to_int_coords: bool = True
+    ) -> None:
+        """Create the global settings data, using the default value for anything not given."""
+        self.update_type = update_type
+        self.cursor_epsilon = cursor_epsilon
+        self.snap_dist = snap_dist
+        self.snap_to_int_coords = snap_to_int_coords
+
+    def __repr__(self) -> str:
+        """Return a string representation of the data, including all the fields."""
+        fields = ', '.join(f'{attr}={getattr(self, attr)!r}' for attr in self.__slots__)
+        return f'{self.__class__.__name__}({fields})'
+
+    def __eq__(self, other: object) -> bool:
+        """Check if all the fields of the two objects are equal."""
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
     def save_to_file(self, filename: str) -> None:
         """Save the global settings data to a file, creating parent directories as needed."""
         parent_dir = pathlib.Path(os.path.expanduser(filename)).parent.absolute()
@@ -50,10 +76,15 @@ class GlobalSettingsData:
         if not os.path.isdir(parent_dir):
             os.makedirs(parent_dir)
 
-        data: Tuple[str, GlobalSettingsData] = (lintrans.__version__, self)
+        fields = {attr: getattr(self, attr) for attr in self.__slots__}
+        fields['update_type'] = self.update_type.name
 
-        with open(filename, 'wb') as f:
-            pickle.dump(data, f, protocol=4)
+        # We write to a temporary file and then replace the real one, so that we never leave a half-written file
+        temp_filename = filename + '.tmp'
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            json.dump({'version': lintrans.__version__, 'data': fields}, f, indent=4)
+
+        os.replace(temp_filename, filename)
 
     @classmethod
     def load_from_file(cls, filename: str) -> Tuple[str, GlobalSettingsData]:
@@ -61,22 +92,69 @@ class GlobalSettingsData:
 
         The tuple we return has the version of lintrans that was used to save the file, and the data itself.
 
-        :raises EOFError: If the file doesn't contain a pickled Python object
-        :raises FileNotFoundError: If the file doesn't exist
-        :raises ValueError: If the file contains a pickled object of the wrong type
+        Any field that's missing or has a value of the wrong type (probably because someone
+        edited the file by hand) gets its default value.
+
+        :raises ValueError: If the file doesn't contain valid JSON, or contains JSON of the wrong shape
         """
         if not os.path.isfile(filename):
             return lintrans.__version__, cls()
 
+        with open(filename, 'r', encoding='utf-8') as f:
+            file_data = json.load(f)
+
+        if not isinstance(file_data, dict) or not isinstance(file_data.get('data'), dict):
+            raise ValueError(f'File {filename} contains JSON of the wrong shape (must be an object with a data object)')
+
+        fields = file_data['data']
+
+        # Create a default object and overwrite the fields that we have. Anything missing
+        # must be from an older version, so we can use the default values from `cls()`
+        data = cls()
+        for attr in cls.__slots__:
+            if attr not in fields:
+                continue
+
+            value = fields[attr]
+            default = getattr(data, attr)
+
+            if isinstance(default, UpdateType):
+                value = UpdateType.__members__.get(value) if isinstance(value, str) else None
+            elif isinstance(default, float) and type(value) is int:
+                value = float(value)
+
+            # We compare exact types so that something like true doesn't count as an int
+            if type(value) is type(default):
+                setattr(data, attr, value)
+
+        return str(file_data.get('version', lintrans.__version__)), data
+
+    @classmethod
+    def load_from_legacy_file(cls, filename: str) -> Tuple[str, GlobalSettingsData]:
+        """Return the global settings data from a pickled file written by an older version of lintrans.
+
+        This is only used to migrate old settings to the JSON format used by :meth:`load_from_file`.
+
+        :raises FileNotFoundError: If the file doesn't exist
+        :raises ValueError: If the file can't be unpickled, or contains a pickled object of the wrong type
+        """
+        import pickle
+
         with open(filename, 'rb') as f:
-            file_data = pickle.load(f)
+            # Unpickling a corrupt file can fail in all sorts of ways, so we turn them all into a ValueError
+            try:
+                file_data = pickle.load(f)
+            except (
+                pickle.UnpicklingError, AttributeError, EOFError, ImportError, IndexError, KeyError, TypeError
+            ) as e:
+                raise ValueError(f'File {filename} does not contain a valid pickled object') from e
 
-        if not isinstance(file_data, tuple):
-            raise ValueError(f'File {filename} contains pickled object of the wrong type (must be tuple)')
+        if not isinstance(file_data, tuple) or len(file_data) != 2:
+            raise ValueError(f'File {filename} contains pickled object of the wrong type (must be 2-tuple)')
 
         # Create a default object and overwrite the fields that we have
         data = cls()
-        for attr in file_data[1].__slots__:
+        for attr in cls.__slots__:
             # Try to get the attribute from the old data, but don't worry if we can't,
             # because that means it's from an older version, so we can use the default
             # values from `cls()`
@@ -88,23 +166,39 @@ class GlobalSettingsData:
         return file_data[0], data
 
 
-@singleton
 class GlobalSettings:
     """A singleton class to provide global settings that can be shared throughout the app.
 
     .. note::
        This is a singleton class because we only want :meth:`__init__` to be called once
-       to reduce processing time. We also can't cache it as a global variable because that
-       would be created at import time, leading to infinite process recursion when lintrans
-       tries to call its own executable to find out if it's compiled or interpreted.
+       to reduce processing time. We don't create it as a global variable because that would
+       create the settings directories as a side effect of importing this module.
 
     The directory methods are split up into things like :meth:`get_save_directory` and
     :meth:`get_crash_reports_directory` to make sure the directories exist and discourage
     the use of other directories in the root one.
     """
 
+    _instance: GlobalSettings | None = None
+    _initialized: bool = False
+
+    def __new__(cls) -> GlobalSettings:
+        """Return the only instance of the global settings, creating it if it doesn't exist yet."""
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+
+        return cls._instance
+
     def __init__(self) -> None:
-        """Create the global settings object and initialize state."""
+        """Create the global settings object and initialize state.
+
+        Python calls this on every ``GlobalSettings()``, so we return early if we've already done it.
+        """
+        if self._initialized:
+            return
+
+        self._initialized = True
+
         # The root directory is OS-dependent
         if os.name == 'posix':
             self._directory = os.path.join(
@@ -124,52 +218,40 @@ class GlobalSettings:
             # lintrans is only compatible with Python >= 3.11 anyway
             raise OSError(f'Unrecognised OS "{os.name}"')
 
-        sub_directories = ['saves', 'crash_reports']
+        self._save_directory = os.path.join(self._directory, 'saves')
+        self._crash_reports_directory = os.path.join(self._directory, 'crash_reports')
 
-        os.makedirs(self._directory, exist_ok=True)
-        for sub_directory in sub_directories:
-            os.makedirs(os.path.join(self._directory, sub_directory), exist_ok=True)
+        # makedirs creates the root directory along with the first sub-directory if it needs to
+        for sub_directory in (self._save_directory, self._crash_reports_directory):
+            os.makedirs(sub_directory, exist_ok=True)
 
         self._executable_path: Optional[str] = None
 
-        self._settings_file = os.path.join(self._directory, 'settings.dat')
+        self._settings_file = os.path.join(self._directory, 'settings.json')
+        self._legacy_settings_file = os.path.join(self._directory, 'settings.dat')
         self._display_settings_file = os.path.join(self._directory, 'display_settings.dat')
 
-        try:
-            self._data = GlobalSettingsData.load_from_file(self._settings_file)[1]
-        except KeyError:
-            self._data = GlobalSettingsData()
-            self._data.save_to_file(self._settings_file)
+        # Plenty of code paths never need the data, so we only load it when it's first asked for
+        self._data: Optional[GlobalSettingsData] = None
 
     def get_executable_path(self) -> str:
         """Return the path to the binary executable, or an empty string if lintrans is not installed standalone.
 
-        This method will call :attr:`sys.executable` to see if it's lintrans. If it is, then we cache the path for
-        future use and return it. Otherwise, it's a Python interpreter, so we return an empty string instead.
+        Standalone builds are frozen by PyInstaller, which sets ``sys.frozen`` and points :attr:`sys.executable` at
+        the lintrans binary. Otherwise, :attr:`sys.executable` is a Python interpreter, so we return an empty string.
         """
         if self._executable_path is None:
-            executable_path = sys.executable
-            if os.path.isfile(executable_path):
-                version_output = subprocess.run(
-                    [executable_path, '--version'],
-                    stdout=subprocess.PIPE,
-                    shell=(os.name == 'nt')
-                ).stdout.decode()
-
-                if 'lintrans' in version_output:
-                    self._executable_path = executable_path
-                else:
-                    self._executable_path = ''
+            self._executable_path = sys.executable if getattr(sys, 'frozen', False) else ''
 
-        return self._executable_path or ''
+        return self._executable_path
 
     def get_save_directory(self) -> str:
         """Return the default directory for save files."""
-        return os.path.join(self._directory, 'saves')
+        return self._save_directory
 
     def get_crash_reports_directory(self) -> str:
         """Return the default directory for crash reports."""
-        return os.path.join(self._directory, 'crash_reports')
+        return self._crash_reports_directory
 
     def get_settings_file(self) -> str:
         """Return the full path of the settings file."""
@@ -201,7 +283,20 @@ class GlobalSettings:
         return str(Path(self.get_executable_path()).parent / 'replace.bat')
 
     def get_data(self) -> GlobalSettingsData:
-        """Return a copy of the internal global settings data."""
+        """Return a copy of the internal global settings data, loading it from the settings file if needed."""
+        if self._data is None:
+            try:
+                # Older versions pickled the settings, so we convert them to JSON the first time we see them
+                if not os.path.isfile(self._settings_file) and os.path.isfile(self._legacy_settings_file):
+                    self._data = GlobalSettingsData.load_from_legacy_file(self._legacy_settings_file)[1]
+                    self._data.save_to_file(self._settings_file)
+                else:
+                    self._data = GlobalSettingsData.load_from_file(self._settings_file)[1]
+
+            # We only write the settings file when the user changes something with set_data
+            except ValueError:
+                self._data = GlobalSettingsData()
+
         return copy(self._data)
 
     def set_data(self, data: GlobalSettingsData) -> None:
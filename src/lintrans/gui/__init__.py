@@ -4,9 +4,39 @@
 # This program is licensed under GNU GPLv3, available here:
 # <https://www.gnu.org/licenses/gpl-3.0.html>
 
-"""This package supplies the main GUI and associated dialogs for visualization."""
+"""This package supplies the main GUI and associated dialogs for visualization.
 
-from . import dialogs, plots, session, settings, utility, validate
-from .main_window import main
+The submodules are imported lazily when they're first accessed, so that something like
+``lintrans.gui.settings`` doesn't have to import every dialog and plot widget.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import TYPE_CHECKING, Callable, NoReturn
+
+if TYPE_CHECKING:
+    from . import dialogs, plots, session, settings, utility, validate
+    from .main_window import main
 
 __all__ = ['dialogs', 'main', 'plots', 'session', 'settings', 'utility', 'validate']
+
+
+def __getattr__(name: str) -> ModuleType | Callable[[str | None], NoReturn]:
+    """Import and return the submodule called ``name`` (or :func:`main`) the first time that it's accessed.
+
+    :raises AttributeError: If there is no submodule called ``name``
+    """
+    if name == 'main':
+        from .main_window import main
+
+        globals()['main'] = main
+        return main
+
+    if name in __all__:
+        module = importlib.import_module(f'.{name}', __name__)
+        globals()[name] = module
+        return module
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
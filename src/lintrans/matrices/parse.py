@@ -9,8 +9,10 @@
 from __future__ import annotations
 
 import re
+import string
 from dataclasses import dataclass
-from typing import List, Pattern, Set, Tuple
+from functools import lru_cache
+from typing import Dict, List, Pattern, Set, Tuple
 
 from lintrans.typing_ import MatrixParseList
 
@@ -40,7 +42,7 @@ def compile_naive_expression_pattern() -> Pattern[str]:
     index = f'(\\^{{{index_content}}}|\\^{index_content})'
     matrix_identifier = f'([A-Z]|rot\\(-?{real_number}\\)|{anonymous_matrix}|\\({NAIVE_CHARACTER_CLASS}+\\))'
     matrix = '(' + real_number + '?' + matrix_identifier + index + '?)'
-    expression = f'^-?{matrix}+((\\+-?|-){matrix}+)*$'
+    expression = f'-?{matrix}+((\\+-?|-){matrix}+)*'
 
     return re.compile(expression)
 
@@ -48,6 +50,220 @@ def compile_naive_expression_pattern() -> Pattern[str]:
 # This is an expensive pattern to compile, so we compile it when this module is initialized
 _naive_expression_pattern = compile_naive_expression_pattern()
 
+_NAIVE_CHARACTERS = frozenset('-+ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.rot()^{}[];')
+_NON_ZERO_DIGITS = frozenset('123456789')
+_LETTERS_AND_BRACKET = frozenset(_ALPHABET + '[')
+_ALLOWED_CHARACTERS = frozenset(_ALPHABET + 'rot0123456789.+-^{}()[]; ')
+
+# These patterns are used on every validation and parse, so we compile them once here
+_ROT_PREFIX_RE = re.compile(f'{NAIVE_CHARACTER_CLASS}*?rot\\([-\\d.]+$')
+_ANONYMOUS_WHITESPACE_RE = re.compile(
+    r'\[\s*(-?\d+(?:\.\d+)?)\s+(-?\d+(?:\.\d+)?)\s*;\s*(-?\d+(?:\.\d+)?)\s+(-?\d+(?:\.\d+)?)\s*\]'
+)
+_WHITESPACE_DELETE = str.maketrans('', '', string.whitespace)
+_DECIMAL_EXPONENT_RE = re.compile(r'\^-?\d*\.\d+')
+_ROT_IDENTIFIER_RE = re.compile(r'rot\(([\d.-]+)\)')
+_ANONYMOUS_IDENTIFIER_RE = re.compile(r'\[(-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?);(-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?)\]')
+_EXPONENT_RE = re.compile(r'\^\{(-?\d+|T)\}')
+_ROT_BODY_RE = re.compile(r'rot\(\d+(\.\d+)?\)')
+
+
+class _ExpressionScanner:
+    """A hand-written scanner that accepts exactly the expressions matched by :func:`compile_naive_expression_pattern`.
+
+    Each method takes a position in the expression and returns the set of all positions where the
+    corresponding part of the pattern could end, which is what the RegEx engine explores by backtracking.
+    An empty set means that the part can't be matched at that position.
+
+    This class should be used like this:
+
+    >>> _ExpressionScanner('3A^-1B').scan()
+    True
+    >>> _ExpressionScanner('A^').scan()
+    False
+    """
+
+    def __init__(self, expression: str):
+        """Create a scanner for the given expression, which should already have its whitespace stripped."""
+        self._src = expression
+        self._matrix_cache: Dict[int, Set[int]] = {}
+
+    def _char(self, i: int) -> str:
+        """Return the character at position ``i``, or an empty string if we're past the end."""
+        return self._src[i] if i < len(self._src) else ''
+
+    def _digits_end(self, i: int) -> int:
+        """Return the position just after the run of digits starting at position ``i``."""
+        while self._char(i).isdecimal():
+            i += 1
+
+        return i
+
+    def _real_number(self, i: int) -> Set[int]:
+        """Scan a real number with no sign, like ``12`` or ``0.5``."""
+        char = self._char(i)
+
+        if char in _NON_ZERO_DIGITS:
+            # The integer part can end after any of its digits, but only the full integer part can be followed by a dot
+            integer_end = self._digits_end(i + 1)
+            ends = set(range(i + 1, integer_end + 1))
+
+        elif char == '0' and self._char(i + 1) == '.':
+            integer_end = i + 1
+            ends = set()
+
+        else:
+            return set()
+
+        if self._char(integer_end) == '.':
+            fraction_end = self._digits_end(integer_end + 1)
+            ends.update(range(integer_end + 2, fraction_end + 1))
+
+        return ends
+
+    def _anonymous_number(self, i: int) -> int | None:
+        """Scan a number in an anonymous matrix and return the position where it ends, or None if it doesn't match.
+
+        These numbers are always followed by a space, semicolon, or closing bracket, so only the longest match counts.
+        """
+        if self._char(i) == '-':
+            i += 1
+
+        if (end := self._digits_end(i)) == i:
+            return None
+
+        if self._char(end) == '.' and (fraction_end := self._digits_end(end + 1)) > end + 1:
+            end = fraction_end
+
+        return end
+
+    def _anonymous_matrix(self, i: int) -> Set[int]:
+        """Scan an anonymous matrix, like ``[1 2;3 4]``."""
+        if self._char(i) != '[':
+            return set()
+
+        i += 1
+
+        for delimiter in ' ; ]':
+            if (end := self._anonymous_number(i)) is None or self._char(end) != delimiter:
+                return set()
+
+            i = end + 1
+
+        return {i}
+
+    def _matrix_identifier(self, i: int) -> Set[int]:
+        """Scan a matrix identifier, which is a letter, a rotation, an anonymous matrix, or a parenthesized group."""
+        char = self._char(i)
+
+        if char in _ALPHABET and char != '':
+            return {i + 1}
+
+        if self._src.startswith('rot(', i):
+            start = i + 5 if self._char(i + 4) == '-' else i + 4
+            return {end + 1 for end in self._real_number(start) if self._char(end) == ')'}
+
+        if char == '[':
+            return self._anonymous_matrix(i)
+
+        if char == '(':
+            # The contents can be any naive characters, so any later closing paren could be the end
+            ends = set()
+
+            for j in range(i + 1, len(self._src)):
+                content_char = self._src[j]
+
+                if content_char == ')' and j > i + 1:
+                    ends.add(j + 1)
+
+                if content_char not in _NAIVE_CHARACTERS and not content_char.isspace():
+                    break
+
+            return ends
+
+        return set()
+
+    def _index_content(self, i: int) -> Set[int]:
+        """Scan the content of an index, which is a non-zero integer or ``T``."""
+        if self._char(i) == 'T':
+            return {i + 1}
+
+        if self._char(i) == '-':
+            i += 1
+
+        if self._char(i) not in _NON_ZERO_DIGITS:
+            return set()
+
+        return set(range(i + 1, self._digits_end(i + 1) + 1))
+
+    def _index(self, i: int) -> Set[int]:
+        """Scan an index, like ``^2`` or ``^{-1}``."""
+        if self._char(i) != '^':
+            return set()
+
+        if self._char(i + 1) == '{':
+            return {end + 1 for end in self._index_content(i + 2) if self._char(end) == '}'}
+
+        return self._index_content(i + 1)
+
+    def _matrix(self, i: int) -> Set[int]:
+        """Scan a matrix with an optional multiplier and an optional index."""
+        if i in self._matrix_cache:
+            return self._matrix_cache[i]
+
+        identifier_ends: Set[int] = set()
+        for start in {i} | self._real_number(i):
+            identifier_ends |= self._matrix_identifier(start)
+
+        ends = set(identifier_ends)
+        for end in identifier_ends:
+            ends |= self._index(end)
+
+        self._matrix_cache[i] = ends
+        return ends
+
+    def _matrices(self, starts: Set[int]) -> Set[int]:
+        """Scan one or more consecutive matrices starting at any of the given positions."""
+        ends: Set[int] = set()
+        frontier = set(starts)
+        seen: Set[int] = set()
+
+        while frontier:
+            new_ends: Set[int] = set()
+            for i in frontier:
+                new_ends |= self._matrix(i)
+
+            seen |= frontier
+            ends |= new_ends
+            frontier = new_ends - seen
+
+        return ends
+
+    def scan(self) -> bool:
+        """Return whether the whole expression matches the naive expression pattern."""
+        starts = {1, 0} if self._char(0) == '-' else {0}
+        ends = self._matrices(starts)
+        seen: Set[int] = set()
+
+        # Every time we reach the end of a group of matrices, we could start a new group after a + or -
+        while frontier := ends - seen:
+            seen |= frontier
+            group_starts: Set[int] = set()
+
+            for i in frontier:
+                if self._char(i) == '+':
+                    group_starts.add(i + 1)
+
+                    if self._char(i + 1) == '-':
+                        group_starts.add(i + 2)
+
+                elif self._char(i) == '-':
+                    group_starts.add(i + 1)
+
+            ends |= self._matrices(group_starts)
+
+        return len(self._src) in ends
+
 
 def find_sub_expressions(expression: str) -> List[str]:
     """Find all the sub-expressions in the given expression.
@@ -74,7 +290,7 @@ def find_sub_expressions(expression: str) -> List[str]:
                 pointer += 1
                 continue
 
-        elif char == ')' and re.match(f'{NAIVE_CHARACTER_CLASS}*?rot\\([-\\d.]+$', expression[:pointer]) is None:
+        elif char == ')' and _ROT_PREFIX_RE.match(expression, 0, pointer) is None:
             paren_depth -= 1
 
         if paren_depth > 0:
@@ -102,16 +318,95 @@ def strip_whitespace(expression: str) -> str:
     numbers, but no space after the semi-colon, like so: ``[1 -2;3.4 5]``.
     """
     # We replace the necessary whitespace with null bytes to preserve it
-    expression = re.sub(
-        r'\[\s*(-?\d+(?:\.\d+)?)\s+(-?\d+(?:\.\d+)?)\s*;\s*(-?\d+(?:\.\d+)?)\s+(-?\d+(?:\.\d+)?)\s*\]',
-        r'[\g<1> \g<2>;\g<3> \g<4>]'.replace(' ', '\x00'),
-        expression
-    )
+    expression = _ANONYMOUS_WHITESPACE_RE.sub(r'[\g<1> \g<2>;\g<3> \g<4>]'.replace(' ', '\x00'), expression)
+
+    return expression.translate(_WHITESPACE_DELETE).replace('\x00', ' ')
+
+
+def _digits_end(expression: str, i: int) -> int:
+    """Return the position just after the run of digits starting at position ``i`` in the expression."""
+    while i < len(expression) and expression[i].isdecimal():
+        i += 1
+
+    return i
+
+
+def _normalise_expression(expression: str) -> str:
+    """Normalise a valid expression with no whitespace so that it's easier to parse.
+
+    This wraps all exponents and transposition powers with ``{}``, gives standalone minuses
+    a multiplier of 1, and replaces subtractions with additions of negative multipliers. We
+    do all of this in a single pass over the expression.
+
+    >>> _normalise_expression('A^2-B')
+    'A^{2}+-1B'
+    >>> _normalise_expression('-3A^T-(B^-1)')
+    '-3A^{T}-(B^{-1})'
+    """
+    parts: List[str] = []
+    i = 0
 
-    expression = re.sub(r'\s', '', expression)
-    return re.sub('\x00', ' ', expression)
+    while i < len(expression):
+        char = expression[i]
 
+        if char == '^':
+            # Wrap an unwrapped exponent like ^-12 or ^T, unless it's followed by a closing brace
+            if expression[i + 1:i + 2] == 'T':
+                end = i + 2 if expression[i + 2:i + 3] != '}' else None
 
+            else:
+                start = i + 2 if expression[i + 1:i + 2] == '-' else i + 1
+                end = _digits_end(expression, start)
+
+                # We need at least one digit, and if the digits are followed by a closing brace,
+                # then we only wrap all but the last one, just like a backtracking RegEx would
+                if expression[end:end + 1] == '}':
+                    end -= 1
+
+                if end <= start:
+                    end = None
+
+            if end is None:
+                parts.append(char)
+                i += 1
+            else:
+                parts.append('^{' + expression[i + 1:end] + '}')
+                i = end
+
+            continue
+
+        if char == '-':
+            next_char = expression[i + 1:i + 2]
+
+            if next_char in _LETTERS_AND_BRACKET:
+                # A standalone minus, like -A, is the same as -1A, which we treat as an addition
+                parts.append('+-1')
+
+            else:
+                # A subtraction of something with a multiplier, like -3.4A, is an addition of a negative multiplier
+                end = _digits_end(expression, i + 1)
+
+                if end > i + 1 and expression[end:end + 1] == '.':
+                    end = _digits_end(expression, end + 1)
+
+                is_identifier = expression[end:end + 1] in _LETTERS_AND_BRACKET or expression.startswith('rot', end)
+
+                if end > i + 1 and is_identifier:
+                    parts.append('+-')
+                else:
+                    parts.append('-')
+
+            i += 1
+            continue
+
+        parts.append(char)
+        i += 1
+
+    # Get rid of a potential leading + introduced by replacing subtractions with additions
+    return ''.join(parts).removeprefix('+')
+
+
+@lru_cache(maxsize=256)
 def validate_matrix_expression(expression: str) -> bool:
     """Validate the given matrix expression.
 
@@ -121,21 +416,25 @@ def validate_matrix_expression(expression: str) -> bool:
     :meth:`~lintrans.matrices.wrapper.MatrixWrapper.is_valid_expression` method on
     :class:`~lintrans.matrices.wrapper.MatrixWrapper`.
 
+    The GUI validates the expression on every keystroke, so results are cached.
+
     :param str expression: The expression to be validated
     :returns bool: Whether the expression is valid according to the schema
     """
     # Remove all whitespace
     expression = strip_whitespace(expression)
-    match = _naive_expression_pattern.match(expression)
 
-    if match is None:
+    # These checks are much cheaper than a full scan, and they catch most of the garbage typed into the GUI
+    if not expression or not _ALLOWED_CHARACTERS.issuperset(expression):
         return False
 
-    if re.search(r'\^-?\d*\.\d+', expression) is not None:
+    if expression.count('(') != expression.count(')') or expression.count('{') != expression.count('}'):
         return False
 
-    # Check that the whole expression was matched against
-    if expression != match.group(0):
+    if not _ExpressionScanner(expression).scan():
+        return False
+
+    if _DECIMAL_EXPONENT_RE.search(expression) is not None:
         return False
 
     try:
@@ -185,19 +484,7 @@ class ExpressionParser:
         if not validate_matrix_expression(expression):
             raise MatrixParseError('Invalid expression')
 
-        # Wrap all exponents and transposition powers with {}
-        expression = re.sub(r'(?<=\^)(-?\d+|T)(?=[^}]|$)', r'{\g<0>}', expression)
-
-        # Remove any standalone minuses
-        expression = re.sub(r'-(?=[A-Z]|\[)', '-1', expression)
-
-        # Replace subtractions with additions
-        expression = re.sub(r'-(?=\d+\.?\d*([A-Z]|rot|\[))', '+-', expression)
-
-        # Get rid of a potential leading + introduced by the last step
-        expression = re.sub(r'^\+', '', expression)
-
-        self._expression = expression
+        self._expression = _normalise_expression(expression)
         self._pointer: int = 0
 
         self._current_token = MatrixToken()
@@ -355,7 +642,7 @@ class ExpressionParser:
 
         :raises MatrixParseError: If we fail to parse this part of the matrix
         """
-        if match := re.match(r'rot\(([\d.-]+)\)', self._expression[self._pointer:]):
+        if match := _ROT_IDENTIFIER_RE.match(self._expression, self._pointer):
             # Ensure that the number in brackets is a valid float
             try:
                 float(match.group(1))
@@ -371,10 +658,7 @@ class ExpressionParser:
 
     def _parse_anonymous_identifer(self) -> None:
         """Parse an anonymous matrix, including the square brackets."""
-        if match := re.match(
-            r'^\[(-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?);(-?\d+(?:\.\d+)?) (-?\d+(?:\.\d+)?)\]',
-            self._expression[self._pointer:]
-        ):
+        if match := _ANONYMOUS_IDENTIFIER_RE.match(self._expression, self._pointer):
             for n in range(1, 4 + 1):
                 try:
                     float(match.group(n))
@@ -427,7 +711,7 @@ class ExpressionParser:
 
         :raises MatrixParseError: If we fail to parse this part of the token
         """
-        if match := re.match(r'\^\{(-?\d+|T)\}', self._expression[self._pointer:]):
+        if match := _EXPONENT_RE.match(self._expression, self._pointer):
             exponent = match.group(1)
 
             try:
@@ -483,7 +767,7 @@ def get_matrix_identifiers(expression: str) -> Set[str]:
         if body in _ALPHABET:
             s.add(body)
 
-        elif re.match(r'rot\(\d+(\.\d+)?\)', body):
+        elif _ROT_BODY_RE.match(body):
             continue
 
         else:
@@ -63,12 +63,17 @@ def new_version_exists() -> Tuple[bool, Optional[str]]:
     if not os.path.isfile(executable_path):
         return True, latest_version_str
 
-    # Now check the current version
-    version_output = subprocess.run(
-        [executable_path, '--version'],
-        stdout=subprocess.PIPE,
-        shell=(os.name == 'nt')
-    ).stdout.decode()
+    # Now check the current version, making sure that a broken executable can't hang us forever
+    try:
+        version_output = subprocess.run(
+            [executable_path, '--version'],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            shell=(os.name == 'nt')
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return False, None
 
     match = re.search(r'(?<=lintrans \(version )\d+\.\d+\.\d+(-\w+(-?\d+))?(?=\))', version_output)
 
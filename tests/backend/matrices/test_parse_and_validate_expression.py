@@ -10,7 +10,9 @@ from typing import List, Tuple
 
 import pytest
 
-from lintrans.matrices.parse import (MatrixParseError, find_sub_expressions,
+from lintrans.matrices.parse import (MatrixParseError, _ExpressionScanner,
+                                     _naive_expression_pattern,
+                                     find_sub_expressions,
                                      get_matrix_identifiers,
                                      parse_matrix_expression, strip_whitespace,
                                      validate_matrix_expression)
@@ -80,6 +82,7 @@ invalid_inputs: List[str] = [
     '.A', '1.A', '2.3AB)^T', '(AB+)', '-4.6(9A', '-2(3.4A^{-1}-C^)^2', '9.2)', '3A^2B+4A(B+C)^-1D^T-A(C(D+EB)',
     '3()^2', '4(your mum)^T', 'rot()', 'rot(10.1.1)', 'rot(--2)', '[]', '[1 2]', '[-1;3]', '[2 3; 5.6]',
     '1 2; 3 4', '[1 2; 34]', '[1 2 3; 4 5]', '[1 2 3; 4 5 6]', '[;]', '[1; 2 3 4]',
+    '6A(TA+-M^125I^2)^T}+-rot(11)', 'BA(29CBM)^1}+B',
 
     'This is 100% a valid matrix expression, I swear'
 ]
@@ -92,6 +95,14 @@ def test_validate_matrix_expression(inputs: List[str], output: bool) -> None:
         assert validate_matrix_expression(inp) == output
 
 
+@pytest.mark.parametrize('inputs', [valid_inputs, invalid_inputs])
+def test_expression_scanner_matches_naive_pattern(inputs: List[str]) -> None:
+    """Test that :class:`_ExpressionScanner` accepts exactly the same expressions as the RegEx pattern."""
+    for inp in inputs:
+        expression = strip_whitespace(inp)
+        assert _ExpressionScanner(expression).scan() == (_naive_expression_pattern.fullmatch(expression) is not None)
+
+
 expressions_and_parsed_expressions: List[Tuple[str, MatrixParseList]] = [
     # Simple expressions
     ('A', [[('', 'A', '')]]),
@@ -0,0 +1,94 @@
+# lintrans - The linear transformation visualizer
+# Copyright (C) 2021-2022 D. Dyson (DoctorDalek1963)
+
+# This program is licensed under GNU GPLv3, available here:
+# <https://www.gnu.org/licenses/gpl-3.0.html>
+
+"""Test the functionality of saving and loading the global settings data."""
+
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+import lintrans
+from lintrans.global_settings import GlobalSettingsData, UpdateType
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    """Test that global settings data saves and loads and returns the same data."""
+    data = GlobalSettingsData(
+        update_type=UpdateType.never,
+        cursor_epsilon=12,
+        snap_dist=0.25,
+        snap_to_int_coords=False
+    )
+
+    path = str((tmp_path / 'settings.json').absolute())
+    data.save_to_file(path)
+
+    version, loaded_data = GlobalSettingsData.load_from_file(path)
+    assert loaded_data == data
+    assert version == lintrans.__version__
+
+
+def test_load_missing_fields(tmp_path: Path) -> None:
+    """Test that fields missing from the file take their default values."""
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps({'version': '0.4.0', 'data': {'update_type': 'auto'}}), encoding='utf-8')
+
+    version, loaded_data = GlobalSettingsData.load_from_file(str(path))
+    assert loaded_data == GlobalSettingsData(update_type=UpdateType.auto)
+    assert version == '0.4.0'
+
+
+def test_load_wrong_shape(tmp_path: Path) -> None:
+    """Test that loading JSON of the wrong shape raises an error."""
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps([1, 2, 3]), encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        GlobalSettingsData.load_from_file(str(path))
+
+
+def test_load_legacy_file(tmp_path: Path) -> None:
+    """Test that settings pickled by older versions can still be loaded."""
+    data = GlobalSettingsData(update_type=UpdateType.auto, cursor_epsilon=3)
+
+    path = tmp_path / 'settings.dat'
+    with open(path, 'wb') as f:
+        pickle.dump(('0.4.1', data), f, protocol=4)
+
+    version, loaded_data = GlobalSettingsData.load_from_legacy_file(str(path))
+    assert loaded_data == data
+    assert version == '0.4.1'
+
+
+def test_load_wrong_types(tmp_path: Path) -> None:
+    """Test that fields with values of the wrong type take their default values."""
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps({
+        'version': lintrans.__version__,
+        'data': {
+            'update_type': 'sometimes',
+            'cursor_epsilon': '5',
+            'snap_dist': 1,
+            'snap_to_int_coords': 0
+        }
+    }), encoding='utf-8')
+
+    loaded_data = GlobalSettingsData.load_from_file(str(path))[1]
+    assert loaded_data == GlobalSettingsData(snap_dist=1.0)
+    assert isinstance(loaded_data.snap_dist, float)
+
+
+def test_load_corrupt_legacy_file(tmp_path: Path) -> None:
+    """Test that loading a corrupt legacy file raises a ValueError."""
+    path = tmp_path / 'settings.dat'
+
+    for contents in (b'', b'not a pickle', pickle.dumps([1, 2, 3]), pickle.dumps(('0.4.1',))):
+        path.write_bytes(contents)
+
+        with pytest.raises(ValueError):
+            GlobalSettingsData.load_from_legacy_file(str(path))